@@ -0,0 +1,451 @@
+"""
+Numba-compiled kernels for RMSD calculations.
+
+This module requires `Numba <https://numba.pydata.org/>`_ and is only imported by
+:mod:`spyrmsd.kernels` when Numba is installed. Kernels are compiled lazily, on first
+use, for the types of the arguments.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def sq_dev_mean(A: np.ndarray, B: np.ndarray) -> float:  # pragma: no cover
+    """
+    Mean squared deviation between coordinates (Numba implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B`
+
+    Notes
+    -----
+    The coordinates are flattened into contiguous 1D arrays (without copy, unless
+    the arrays are not contiguous) so that the reduction is a single stream over
+    :math:`3N` elements, which is vectorised by the compiler.
+    """
+    a = np.ascontiguousarray(A).reshape(-1)
+    b = np.ascontiguousarray(B).reshape(-1)
+
+    s = 0.0
+    for i in range(a.shape[0]):
+        d = a[i] - b[i]
+        s += d * d
+
+    return s / A.shape[0]
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def sq_dev_mean_shifted(
+    A: np.ndarray, B: np.ndarray, shift: np.ndarray
+) -> float:  # pragma: no cover
+    """
+    Mean squared deviation between shifted coordinates (Numba implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    shift: numpy.ndarray
+        Shift between coordinates `A` and `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B + shift`
+    """
+    n = A.shape[0]
+
+    sx, sy, sz = shift[0], shift[1], shift[2]
+
+    s = 0.0
+    for i in range(n):
+        dx = A[i, 0] - B[i, 0] - sx
+        dy = A[i, 1] - B[i, 1] - sy
+        dz = A[i, 2] - B[i, 2] - sz
+
+        s += dx * dx + dy * dy + dz * dz
+
+    return s / n
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def sq_dev_mean_permuted(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray, shift: np.ndarray
+) -> float:  # pragma: no cover
+    """
+    Mean squared deviation between permuted coordinates (Numba implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+    shift: numpy.ndarray
+        Shift between coordinates `A` and `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B[idx] + shift`
+    """
+    n = idx.shape[0]
+
+    sx, sy, sz = shift[0], shift[1], shift[2]
+
+    s = 0.0
+    for i in range(n):
+        j = idx[i]
+
+        dx = A[i, 0] - B[j, 0] - sx
+        dy = A[i, 1] - B[j, 1] - sy
+        dz = A[i, 2] - B[j, 2] - sz
+
+        s += dx * dx + dy * dy + dz * dz
+
+    return s / n
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def inner_products(
+    A: np.ndarray, B: np.ndarray, center: bool
+) -> Tuple[np.ndarray, float, float]:  # pragma: no cover
+    """
+    Inner products between coordinate matrices (Numba implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    center: bool
+        Center coordinates at the origin
+
+    Returns
+    -------
+    Tuple[np.ndarray, float, float]
+        Inner product between `A` and `B` (:math:`\\mathbf{M}`) and inner products
+        of `A` and `B` with themselves (:math:`G_a` and :math:`G_b`)
+
+    Notes
+    -----
+    Centering is performed on the fly, without building centred coordinates.
+    """
+    n = A.shape[0]
+
+    # Centers of geometry
+    ca = np.zeros(3)
+    cb = np.zeros(3)
+
+    if center:
+        for i in range(n):
+            for k in range(3):
+                ca[k] += A[i, k]
+                cb[k] += B[i, k]
+
+        for k in range(3):
+            ca[k] /= n
+            cb[k] /= n
+
+    M = np.zeros((3, 3))
+    Ga = 0.0
+    Gb = 0.0
+
+    a = np.empty(3)
+    b = np.empty(3)
+    for i in range(n):
+        for k in range(3):
+            a[k] = A[i, k] - ca[k]
+            b[k] = B[i, k] - cb[k]
+
+            Ga += a[k] * a[k]
+            Gb += b[k] * b[k]
+
+        for j in range(3):
+            for k in range(3):
+                M[j, k] += b[j] * a[k]
+
+    return M, Ga, Gb
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def _sq_dev_sum(a: np.ndarray, b: np.ndarray) -> float:  # pragma: no cover
+    """
+    Sum of squared deviations between flat coordinates.
+
+    Parameters
+    ----------
+    a: numpy.ndarray
+        Flat coordinates `a`
+    b: numpy.ndarray
+        Flat coordinates `b`
+
+    Returns
+    -------
+    float
+        Sum of squared deviations between coordinates `a` and `b`
+    """
+    s = 0.0
+    for i in range(a.shape[0]):
+        d = a[i] - b[i]
+        s += d * d
+
+    return s
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def _sq_dev_sum_permuted(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> float:  # pragma: no cover
+    """
+    Sum of squared deviations between permuted coordinates.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+
+    Returns
+    -------
+    float
+        Sum of squared deviations between coordinates `A` and `B[idx]`
+    """
+    s = 0.0
+    for i in range(idx.shape[0]):
+        j = idx[i]
+
+        dx = A[i, 0] - B[j, 0]
+        dy = A[i, 1] - B[j, 1]
+        dz = A[i, 2] - B[j, 2]
+
+        s += dx * dx + dy * dy + dz * dz
+
+    return s
+
+
+# Serial and parallel kernels are separate functions, since the on-disk cache of
+# Numba is keyed by function and signature but not by compilation flags
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def _sq_dev_mean_batch_serial(
+    A: np.ndarray, B: np.ndarray
+) -> np.ndarray:  # pragma: no cover
+    """
+    Mean squared deviations between coordinates and a batch of coordinates (serial).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of `B`
+    """
+    m = B.shape[0]
+
+    # Flat (contiguous) views, see sq_dev_mean
+    a = np.ascontiguousarray(A).reshape(-1)
+    b = np.ascontiguousarray(B).reshape((m, -1))
+
+    result = np.empty(m)
+    for k in range(m):
+        result[k] = _sq_dev_sum(a, b[k]) / A.shape[0]
+
+    return result
+
+
+@njit(fastmath=True, cache=True, boundscheck=False, parallel=True)
+def _sq_dev_mean_batch_parallel(
+    A: np.ndarray, B: np.ndarray
+) -> np.ndarray:  # pragma: no cover
+    """
+    Mean squared deviations between coordinates and a batch of coordinates
+    (parallel).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of `B`
+
+    Notes
+    -----
+    The loop over the batch is distributed over the Numba threads.
+    """
+    m = B.shape[0]
+
+    # Flat (contiguous) views, see sq_dev_mean
+    a = np.ascontiguousarray(A).reshape(-1)
+    b = np.ascontiguousarray(B).reshape((m, -1))
+
+    result = np.empty(m)
+    for k in prange(m):
+        result[k] = _sq_dev_sum(a, b[k]) / A.shape[0]
+
+    return result
+
+
+@njit(fastmath=True, cache=True, boundscheck=False)
+def _sq_dev_mean_batch_permuted_serial(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> np.ndarray:  # pragma: no cover
+    """
+    Mean squared deviations between coordinates and a batch of permuted coordinates
+    (serial).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of
+        `B[:, idx]`
+    """
+    m = B.shape[0]
+
+    result = np.empty(m)
+    for k in range(m):
+        result[k] = _sq_dev_sum_permuted(A, B[k], idx) / idx.shape[0]
+
+    return result
+
+
+@njit(fastmath=True, cache=True, boundscheck=False, parallel=True)
+def _sq_dev_mean_batch_permuted_parallel(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> np.ndarray:  # pragma: no cover
+    """
+    Mean squared deviations between coordinates and a batch of permuted coordinates
+    (parallel).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of
+        `B[:, idx]`
+
+    Notes
+    -----
+    The loop over the batch is distributed over the Numba threads.
+    """
+    m = B.shape[0]
+
+    result = np.empty(m)
+    for k in prange(m):
+        result[k] = _sq_dev_sum_permuted(A, B[k], idx) / idx.shape[0]
+
+    return result
+
+
+# Minimum number of atoms in a batch (M * N) for which the batch is reduced in
+# parallel (the overhead of starting threads dominates for small batches)
+parallel_threshold: float = 10_000
+
+
+def sq_dev_mean_batch(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of coordinates (Numba
+    implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of `B`
+
+    Notes
+    -----
+    Large batches are distributed over the Numba threads (see
+    :data:`parallel_threshold`).
+    """
+    if B.shape[0] * B.shape[1] >= parallel_threshold:
+        return _sq_dev_mean_batch_parallel(A, B)
+
+    return _sq_dev_mean_batch_serial(A, B)
+
+
+def sq_dev_mean_batch_permuted(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of permuted coordinates
+    (Numba implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of
+        `B[:, idx]`
+
+    Notes
+    -----
+    Large batches are distributed over the Numba threads (see
+    :data:`parallel_threshold`).
+    """
+    if B.shape[0] * B.shape[1] >= parallel_threshold:
+        return _sq_dev_mean_batch_permuted_parallel(A, B, idx)
+
+    return _sq_dev_mean_batch_permuted_serial(A, B, idx)
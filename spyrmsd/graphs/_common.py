@@ -1,3 +1,6 @@
+from collections import Counter
+from typing import Any, Optional, Sequence
+
 warn_disconnected_graph: str = "Disconnected graph detected. Is this expected?"
 warn_no_atomic_properties: str = (
     "No atomic property information stored on nodes. Node matching is not performed..."
@@ -6,3 +9,50 @@ warn_no_atomic_properties: str = (
 error_non_isomorphic_graphs: str = (
     "Graphs are not isomorphic.\nMake sure graphs have the same connectivity."
 )
+
+
+def invariants_match(
+    degrees1: Sequence[int],
+    degrees2: Sequence[int],
+    aprops1: Optional[Sequence[Any]] = None,
+    aprops2: Optional[Sequence[Any]] = None,
+) -> bool:
+    """
+    Check if simple graph invariants match.
+
+    Parameters
+    ----------
+    degrees1: Sequence[int]
+        Node degrees of graph 1
+    degrees2: Sequence[int]
+        Node degrees of graph 2
+    aprops1: Sequence[Any], optional
+        Atomic properties of the nodes of graph 1
+    aprops2: Sequence[Any], optional
+        Atomic properties of the nodes of graph 2
+
+    Returns
+    -------
+    bool
+        :code:`False` if the graphs can't be isomorphic, :code:`True` otherwise
+
+    Notes
+    -----
+    The invariants are the number of nodes and the multiset of node degrees (paired
+    with atomic properties, if given for both graphs). Graphs with different
+    invariants are not isomorphic, but matching invariants do not guarantee that the
+    graphs are isomorphic.
+
+    Atomic properties can be any Python object. If they are not hashable, only the
+    node degrees are compared.
+    """
+    if len(degrees1) != len(degrees2):
+        return False
+
+    if aprops1 is not None and aprops2 is not None:
+        try:
+            return Counter(zip(degrees1, aprops1)) == Counter(zip(degrees2, aprops2))
+        except TypeError:  # Unhashable atomic properties
+            pass
+
+    return Counter(degrees1) == Counter(degrees2)
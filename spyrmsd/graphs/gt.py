@@ -1,5 +1,6 @@
+import itertools
 import warnings
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
 import graph_tool as gt
 import numpy as np
@@ -8,6 +9,7 @@ from graph_tool import generation, topology
 from spyrmsd.exceptions import NonIsomorphicGraphs
 from spyrmsd.graphs._common import (
     error_non_isomorphic_graphs,
+    invariants_match,
     warn_disconnected_graph,
     warn_no_atomic_properties,
 )
@@ -101,7 +103,7 @@ def graph_from_adjacency_matrix(
     return G
 
 
-def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
+def match_graphs(G1, G2) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
     """
     Compute graph isomorphisms.
 
@@ -114,38 +116,50 @@ def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
 
     Returns
     -------
-    List[Tuple[List[int],List[int]]]
+    Iterator[Tuple[np.ndarray, np.ndarray]]
         All possible mappings between nodes of graph 1 and graph 2 (isomorphisms)
 
     Raises
     ------
     NonIsomorphicGraphs
         If the graphs `G1` and `G2` are not isomorphic
+
+    Notes
+    -----
+    Isomorphisms are generated lazily, so that they are not all stored in memory.
     """
 
     try:
-        maps = topology.subgraph_isomorphism(
-            G1,
-            G2,
-            vertex_label=(
-                G1.vertex_properties["aprops"],
-                G2.vertex_properties["aprops"],
-            ),
-            subgraph=False,
+        vertex_label = (
+            G1.vertex_properties["aprops"],
+            G2.vertex_properties["aprops"],
         )
     except KeyError:
         warnings.warn(warn_no_atomic_properties)
 
-        maps = topology.subgraph_isomorphism(G1, G2, subgraph=False)
+        vertex_label = None
+
+    # Cheap check of graph invariants, to avoid running VF2 on non-isomorphic graphs
+    if not invariants_match(
+        G1.get_total_degrees(G1.get_vertices()).tolist(),
+        G2.get_total_degrees(G2.get_vertices()).tolist(),
+        None if vertex_label is None else [vertex_label[0][v] for v in G1.vertices()],
+        None if vertex_label is None else [vertex_label[1][v] for v in G2.vertices()],
+    ):
+        raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
+
+    maps = topology.subgraph_isomorphism(
+        G1, G2, vertex_label=vertex_label, subgraph=False, generator=True
+    )
 
     # Check if graphs are actually isomorphic
-    if len(maps) == 0:
+    first = next(maps, None)
+    if first is None:
         raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
 
     n = num_vertices(G1)
 
-    # Extract all isomorphisms in a list
-    return [(np.arange(0, n, dtype=int), m.a) for m in maps]
+    return ((np.arange(0, n, dtype=int), m.a) for m in itertools.chain([first], maps))
 
 
 def vertex_property(G, vproperty: str, idx: int) -> Any:
@@ -1,5 +1,6 @@
+import itertools
 import warnings
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
 import networkx as nx
 import numpy as np
@@ -7,6 +8,7 @@ import numpy as np
 from spyrmsd.exceptions import NonIsomorphicGraphs
 from spyrmsd.graphs._common import (
     error_non_isomorphic_graphs,
+    invariants_match,
     warn_disconnected_graph,
     warn_no_atomic_properties,
 )
@@ -36,19 +38,36 @@ def graph_from_adjacency_matrix(
     It the atomic numbers are passed, they are used as node attributes.
     """
 
-    G = nx.Graph(adjacency_matrix)
+    # Get upper triangular adjacency matrix
+    adj = np.triu(adjacency_matrix)
 
-    if not nx.is_connected(G):
-        warnings.warn(warn_disconnected_graph)
+    assert adj.shape[0] == adj.shape[1]
+    num_vertices = adj.shape[0]
 
+    G = nx.Graph()
+
+    # Add nodes, with atomic properties as node attributes (if present)
     if aprops is not None:
-        attributes = {idx: aprops for idx, aprops in enumerate(aprops)}
-        nx.set_node_attributes(G, attributes, "aprops")
+        if isinstance(aprops, np.ndarray):
+            # Python objects are faster than NumPy scalars as node attributes
+            aprops = aprops.tolist()
+
+        assert len(aprops) == num_vertices
+
+        G.add_nodes_from((idx, {"aprops": aprop}) for idx, aprop in enumerate(aprops))
+    else:
+        G.add_nodes_from(range(num_vertices))
+
+    # Add edges from the edge list (only non-zero elements are visited)
+    G.add_edges_from(np.argwhere(adj).tolist())
+
+    if not nx.is_connected(G):
+        warnings.warn(warn_disconnected_graph)
 
     return G
 
 
-def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
+def match_graphs(G1, G2) -> Iterator[Tuple[List[int], List[int]]]:
     """
     Compute graph isomorphisms.
 
@@ -61,13 +80,17 @@ def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
 
     Returns
     -------
-    List[Tuple[List[int],List[int]]]
+    Iterator[Tuple[List[int],List[int]]]
         All possible mappings between nodes of graph 1 and graph 2 (isomorphisms)
 
     Raises
     ------
     NonIsomorphicGraphs
         If the graphs `G1` and `G2` are not isomorphic
+
+    Notes
+    -----
+    Isomorphisms are generated lazily, so that they are not all stored in memory.
     """
 
     def match_aprops(node1, node2):
@@ -89,16 +112,27 @@ def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
     else:
         node_match = match_aprops
 
+    # Cheap check of graph invariants, to avoid running VF2 on non-isomorphic graphs
+    if not invariants_match(
+        [d for _, d in G1.degree()],
+        [d for _, d in G2.degree()],
+        None if node_match is None else [a for _, a in G1.nodes(data="aprops")],
+        None if node_match is None else [a for _, a in G2.nodes(data="aprops")],
+    ):
+        raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
+
     GM = nx.algorithms.isomorphism.GraphMatcher(G1, G2, node_match)
+    isomorphisms = GM.isomorphisms_iter()
 
     # Check if graphs are actually isomorphic
-    if not GM.is_isomorphic():
+    first = next(isomorphisms, None)
+    if first is None:
         raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
 
-    return [
+    return (
         (list(isomorphism.keys()), list(isomorphism.values()))
-        for isomorphism in GM.isomorphisms_iter()
-    ]
+        for isomorphism in itertools.chain([first], isomorphisms)
+    )
 
 
 def vertex_property(G, vproperty: str, idx: int) -> Any:
@@ -1,5 +1,7 @@
+import itertools
+import operator
 import warnings
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 import rustworkx as rx
@@ -7,6 +9,7 @@ import rustworkx as rx
 from spyrmsd.exceptions import NonIsomorphicGraphs
 from spyrmsd.graphs._common import (
     error_non_isomorphic_graphs,
+    invariants_match,
     warn_disconnected_graph,
     warn_no_atomic_properties,
 )
@@ -42,13 +45,17 @@ def graph_from_adjacency_matrix(
         warnings.warn(warn_disconnected_graph)
 
     if aprops is not None:
+        if isinstance(aprops, np.ndarray):
+            # Python objects are faster than NumPy scalars as node payloads
+            aprops = aprops.tolist()
+
         for i in G.node_indices():
             G[i] = aprops[i]
 
     return G
 
 
-def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
+def match_graphs(G1, G2) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
     """
     Compute graph isomorphisms.
 
@@ -61,20 +68,18 @@ def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
 
     Returns
     -------
-    List[Tuple[List[int],List[int]]]
+    Iterator[Tuple[np.ndarray, np.ndarray]]
         All possible mappings between nodes of graph 1 and graph 2 (isomorphisms)
 
     Raises
     ------
     NonIsomorphicGraphs
         If the graphs `G1` and `G2` are not isomorphic
-    """
 
-    def match_aprops(node1, node2):
-        """
-        Check if atomic properties for two nodes match.
-        """
-        return node1 == node2
+    Notes
+    -----
+    Isomorphisms are generated lazily, so that they are not all stored in memory.
+    """
 
     if G1[0] is None or G2[0] is None:
         # Nodes without atomic number information
@@ -84,19 +89,37 @@ def match_graphs(G1, G2) -> List[Tuple[List[int], List[int]]]:
         warnings.warn(warn_no_atomic_properties)
 
     else:
-        node_match = match_aprops
-
-    GM = rx.vf2_mapping(G1, G2, node_match)
+        # Node payloads are the atomic properties, compared directly
+        # A builtin avoids calling a Python function for every candidate pair
+        node_match = operator.eq
+
+    # Cheap check of graph invariants, to avoid running VF2 on non-isomorphic graphs
+    if not invariants_match(
+        [G1.degree(i) for i in G1.node_indices()],
+        [G2.degree(i) for i in G2.node_indices()],
+        None if node_match is None else G1.nodes(),
+        None if node_match is None else G2.nodes(),
+    ):
+        raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
 
-    isomorphisms = [
-        (list(isomorphism.keys()), list(isomorphism.values())) for isomorphism in GM
-    ]
+    # Use the VF2++ matching order (id_order=False) instead of the node index order
+    GM = rx.vf2_mapping(G1, G2, node_match, id_order=False, subgraph=False)
 
     # Check if graphs are actually isomorphic
-    if len(isomorphisms) == 0:
+    first = next(GM, None)
+    if first is None:
         raise NonIsomorphicGraphs(error_non_isomorphic_graphs)
 
-    return isomorphisms
+    n = num_vertices(G1)
+
+    # Fill index arrays directly, without intermediate lists
+    return (
+        (
+            np.fromiter(isomorphism.keys(), dtype=np.intp, count=n),
+            np.fromiter(isomorphism.values(), dtype=np.intp, count=n),
+        )
+        for isomorphism in itertools.chain([first], GM)
+    )
 
 
 def vertex_property(G, vproperty: str, idx: int) -> Any:
@@ -0,0 +1,415 @@
+"""
+Numerical kernels for RMSD calculations.
+
+Kernels are compiled with `Numba <https://numba.pydata.org/>`_ when it is installed.
+Otherwise, equivalent NumPy implementations are used.
+"""
+
+import importlib.util
+from typing import Optional, Tuple
+
+import numpy as np
+
+_numba_available: bool = importlib.util.find_spec("numba") is not None
+
+# Floating point precision of the coordinates used in the kernels
+precisions = {"single": np.float32, "double": np.float64}
+
+# Null shift between coordinates
+_no_shift = np.zeros(3)
+_no_shift.flags.writeable = False
+
+
+def _sq_dev_mean_numpy(A: np.ndarray, B: np.ndarray) -> float:
+    """
+    Mean squared deviation between coordinates (NumPy implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B`
+    """
+    diff = (A - B).ravel()
+
+    return np.dot(diff, diff) / A.shape[0]
+
+
+def _sq_dev_mean_shifted_numpy(
+    A: np.ndarray, B: np.ndarray, shift: np.ndarray
+) -> float:
+    """
+    Mean squared deviation between shifted coordinates (NumPy implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    shift: numpy.ndarray
+        Shift between coordinates `A` and `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B + shift`
+    """
+    diff = A - B
+    diff -= shift
+    diff = diff.ravel()
+
+    return np.dot(diff, diff) / A.shape[0]
+
+
+def _sq_dev_mean_permuted_numpy(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray, shift: np.ndarray
+) -> float:
+    """
+    Mean squared deviation between permuted coordinates (NumPy implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+    shift: numpy.ndarray
+        Shift between coordinates `A` and `B`
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B[idx] + shift`
+    """
+    diff = A - B[idx]
+    diff -= shift
+    diff = diff.ravel()
+
+    return np.dot(diff, diff) / A.shape[0]
+
+
+def _sq_dev_mean_batch_numpy(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of coordinates (NumPy
+    implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of `B`
+    """
+    diff = B - A[np.newaxis]
+
+    return np.einsum("mij,mij->m", diff, diff) / A.shape[0]
+
+
+def _sq_dev_mean_batch_permuted_numpy(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of permuted coordinates
+    (NumPy implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+    idx: numpy.ndarray
+        Permutation of coordinates `B`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of
+        `B[:, idx]`
+    """
+    diff = B[:, idx] - A[np.newaxis]
+
+    return np.einsum("mij,mij->m", diff, diff) / A.shape[0]
+
+
+def _inner_products_numpy(
+    A: np.ndarray, B: np.ndarray, center: bool
+) -> Tuple[np.ndarray, float, float]:
+    """
+    Inner products between coordinate matrices (NumPy implementation).
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    center: bool
+        Center coordinates at the origin
+
+    Returns
+    -------
+    Tuple[np.ndarray, float, float]
+        Inner product between `A` and `B` (:math:`\\mathbf{M}`) and inner products of
+        `A` and `B` with themselves (:math:`G_a` and :math:`G_b`)
+    """
+    if center:
+        A = A - np.mean(A, axis=0)
+        B = B - np.mean(B, axis=0)
+
+    a = A.ravel()
+    b = B.ravel()
+
+    return B.T @ A, np.dot(a, a), np.dot(b, b)
+
+
+if _numba_available:
+    from spyrmsd import _kernels_numba
+
+    _sq_dev_mean = _kernels_numba.sq_dev_mean
+    _sq_dev_mean_shifted = _kernels_numba.sq_dev_mean_shifted
+    _sq_dev_mean_permuted = _kernels_numba.sq_dev_mean_permuted
+    _sq_dev_mean_batch = _kernels_numba.sq_dev_mean_batch
+    _sq_dev_mean_batch_permuted = _kernels_numba.sq_dev_mean_batch_permuted
+    _inner_products = _kernels_numba.inner_products
+else:
+    _sq_dev_mean = _sq_dev_mean_numpy
+    _sq_dev_mean_shifted = _sq_dev_mean_shifted_numpy
+    _sq_dev_mean_permuted = _sq_dev_mean_permuted_numpy
+    _sq_dev_mean_batch = _sq_dev_mean_batch_numpy
+    _sq_dev_mean_batch_permuted = _sq_dev_mean_batch_permuted_numpy
+    _inner_products = _inner_products_numpy
+
+
+def as_precision(A: np.ndarray, precision: str = "double") -> np.ndarray:
+    """
+    Convert coordinates to the given floating point precision.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates
+    precision: str
+        Floating point precision (:code:`"single"` or :code:`"double"`)
+
+    Returns
+    -------
+    numpy.ndarray
+        Coordinates with the given floating point precision
+
+    Raises
+    ------
+    ValueError
+        If the floating point precision is not supported
+
+    Notes
+    -----
+    Coordinates are not copied if they already have the given precision.
+
+    Single precision halves the memory traffic of the kernels, while retaining
+    more significant digits than typical molecular coordinates. The Numba kernels
+    still accumulate the sum of squared deviations in double precision.
+    """
+    try:
+        dtype = precisions[precision]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported precision '{precision}'. "
+            f"Supported precisions are {list(precisions.keys())}."
+        )
+
+    return A.astype(dtype, copy=False)
+
+
+def sq_dev_mean(
+    A: np.ndarray, B: np.ndarray, shift: Optional[np.ndarray] = None
+) -> float:
+    """
+    Mean squared deviation between coordinates.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    shift: numpy.ndarray, optional
+        Shift between coordinates `A` and `B` (in 3D)
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B` (shifted by `shift`)
+
+    Notes
+    -----
+    The mean squared deviation is the square of the RMSD. The square root is not
+    computed so that results can be compared directly (e.g. to find the minimum).
+
+    The mean squared deviation between centred coordinates is obtained with
+    :code:`shift = cog(A) - cog(B)`, since
+
+    .. math:: (a_i - c_A) - (b_i - c_B) = (a_i - b_i) - (c_A - c_B)
+
+    where :math:`c_A` and :math:`c_B` are the centers of geometry. This avoids
+    building centred coordinates.
+
+    A Numba-compiled kernel is used if Numba is available.
+    """
+    assert A.shape == B.shape
+
+    if shift is None:
+        return _sq_dev_mean(A, B)
+
+    assert shift.shape == (3,)
+
+    return _sq_dev_mean_shifted(A, B, shift)
+
+
+def sq_dev_mean_permuted(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray, shift: Optional[np.ndarray] = None
+) -> float:
+    """
+    Mean squared deviation between permuted coordinates.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    idx: numpy.ndarray
+        Permutation of coordinates `B` (integer array)
+    shift: numpy.ndarray, optional
+        Shift between coordinates `A` and `B` (in 3D)
+
+    Returns
+    -------
+    float
+        Mean squared deviation between coordinates `A` and `B[idx]` (shifted by
+        `shift`)
+
+    Notes
+    -----
+    This is equivalent to :code:`sq_dev_mean(A, B[idx], shift)`. The Numba kernel
+    (used if Numba is available) does not build the permuted coordinates.
+    """
+    assert A.shape == B.shape
+    assert idx.shape == (A.shape[0],)
+
+    if shift is None:
+        shift = _no_shift
+
+    assert shift.shape == (3,)
+
+    return _sq_dev_mean_permuted(A, B, idx, shift)
+
+
+def sq_dev_mean_batch(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of coordinates.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of `B`
+
+    Notes
+    -----
+    This is equivalent to :code:`[sq_dev_mean(A, b) for b in B]`, but all the
+    coordinates are reduced with a single call.
+    """
+    assert B.ndim == 3
+    assert A.shape == B.shape[1:]
+
+    return _sq_dev_mean_batch(A, B)
+
+
+def sq_dev_mean_batch_permuted(
+    A: np.ndarray, B: np.ndarray, idx: np.ndarray
+) -> np.ndarray:
+    """
+    Mean squared deviations between coordinates and a batch of permuted coordinates.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`, with shape :code:`(N, 3)`
+    B: numpy.ndarray
+        Batch of coordinates `B`, with shape :code:`(M, N, 3)`
+    idx: numpy.ndarray
+        Permutation of coordinates `B` (integer array)
+
+    Returns
+    -------
+    numpy.ndarray
+        Mean squared deviations between coordinates `A` and each coordinates of
+        `B[:, idx]`
+
+    Notes
+    -----
+    This is equivalent to :code:`[sq_dev_mean_permuted(A, b, idx) for b in B]`, but
+    all the coordinates are reduced with a single call. The same permutation (graph
+    isomorphism) is applied to all the coordinates of the batch.
+    """
+    assert B.ndim == 3
+    assert A.shape == B.shape[1:]
+    assert idx.shape == (A.shape[0],)
+
+    return _sq_dev_mean_batch_permuted(A, B, idx)
+
+
+def inner_products(
+    A: np.ndarray, B: np.ndarray, center: bool = False
+) -> Tuple[np.ndarray, float, float]:
+    """
+    Inner products between coordinate matrices.
+
+    Parameters
+    ----------
+    A: numpy.ndarray
+        Coordinates `A`
+    B: numpy.ndarray
+        Coordinates `B`
+    center: bool
+        Center coordinates at the origin (according to the center of geometry)
+
+    Returns
+    -------
+    Tuple[np.ndarray, float, float]
+        Inner product between `A` and `B` (:math:`\\mathbf{M}`) and inner products of
+        `A` and `B` with themselves (:math:`G_a` and :math:`G_b`)
+
+    Notes
+    -----
+    The inner product :math:`\\mathbf{M}` is the same as :func:`spyrmsd.qcp.M_mtx`,
+    while :math:`G_a = \\text{tr}(\\mathbf{A}^T\\mathbf{A})` and
+    :math:`G_b = \\text{tr}(\\mathbf{B}^T\\mathbf{B})`.
+
+    The Numba kernel (used if Numba is available) computes all the inner products at
+    once, without building centred coordinates.
+    """
+    assert A.shape == B.shape
+
+    return _inner_products(A, B, center)
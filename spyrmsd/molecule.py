@@ -1,3 +1,4 @@
+import copy
 import warnings
 from typing import Dict, List, Optional, Union
 
@@ -161,6 +162,33 @@ class Molecule:
         """
         return utils.center_of_geometry(self.coordinates)
 
+    def copy_coords_only(self) -> "Molecule":
+        """
+        Copy molecule, without copying the molecular topology.
+
+        Returns
+        -------
+        Molecule
+            Molecule with a copy of the atomic coordinates
+
+        Notes
+        -----
+        Only the atomic coordinates are copied. Atomic numbers, adjacency matrix and
+        cached molecular graphs are shared with the original molecule, which is much
+        cheaper than :func:`copy.deepcopy` for large molecules.
+
+        Shared attributes are never modified in place: :func:`strip` and
+        :func:`to_graph` only replace them on the copy.
+        """
+        mol = copy.copy(self)
+
+        mol.coordinates = self.coordinates.copy()
+
+        # Graphs are shared, but new graphs are only added to the copy
+        mol.G = dict(self.G)
+
+        return mol
+
     # TODO: Change name (to stripH)
     def strip(self) -> None:
         """
@@ -0,0 +1,227 @@
+"""
+Parallel RMSD calculations.
+"""
+
+import math
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Dict, List, Optional, Union
+
+from spyrmsd import graph, kernels, molecule
+from spyrmsd.rmsd import rmsdwrapper
+
+# Reference molecule and RMSD options, set once per worker process
+_molref: Optional[molecule.Molecule] = None
+_options: Dict[str, Any] = {}
+
+
+def _init_worker(
+    molref: molecule.Molecule, backend: Optional[str], options: Dict[str, Any]
+) -> None:
+    """
+    Initialise worker process with the reference molecule.
+
+    Parameters
+    ----------
+    molref: molecule.Molecule
+        Reference molecule
+    backend: Optional[str]
+        Graph backend of the parent process
+    options: Dict[str, Any]
+        Options for :func:`spyrmsd.rmsd.rmsdwrapper`
+
+    Notes
+    -----
+    The reference molecule is sent to each worker process only once. Reference
+    preprocessing (stripping of hydrogen atoms and molecular graph) is done here,
+    so that it is not repeated for every task.
+
+    Only serial Numba kernels are used in worker processes.
+
+    This function modifies the global (module) variables of the worker process.
+    """
+    global _molref, _options
+
+    # Worker processes might not inherit the backend (e.g. with "spawn")
+    if backend is not None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            graph._set_backend(backend)
+
+    # Worker processes already run in parallel, always use serial Numba kernels
+    # This avoids oversubscription of threads and compilation of parallel kernels
+    if kernels._numba_available:
+        from spyrmsd import _kernels_numba
+
+        _kernels_numba.parallel_threshold = math.inf
+
+    if options["strip"]:
+        molref.strip()
+
+    # Molecular graph is cached on the molecule
+    if options["symmetry"]:
+        molref.to_graph()
+
+    _molref = molref
+    _options = options
+
+
+def _default_context() -> Optional[BaseContext]:
+    """
+    Default context for starting worker processes.
+
+    Returns
+    -------
+    Optional[BaseContext]
+        :code:`"forkserver"` context if Numba threads have been started in this
+        process (and :code:`"forkserver"` is available), :code:`None` otherwise
+
+    Notes
+    -----
+    Forking a process after Numba threads have been started is not safe with all
+    threading layers (e.g. the process can hang at exit with TBB). Otherwise, the
+    default start method of :mod:`multiprocessing` is used (:code:`None`).
+    """
+    if not kernels._numba_available:
+        return None
+
+    from numba.np.ufunc import parallel as numba_parallel
+
+    threads_started = getattr(numba_parallel, "_is_initialized", True)
+
+    if threads_started and "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+
+    return None
+
+
+def _rmsd_worker(mols: List[molecule.Molecule]) -> List[float]:
+    """
+    Compute RMSD between the reference molecule of the worker and molecules.
+
+    Parameters
+    ----------
+    mols: List[molecule.Molecule]
+        Molecules to compare to the reference molecule
+
+    Returns
+    -------
+    List[float]
+        RMSDs
+    """
+    assert _molref is not None
+
+    return rmsdwrapper(_molref, mols, **_options)
+
+
+def prmsdwrapper(
+    molref: molecule.Molecule,
+    mols: Union[molecule.Molecule, List[molecule.Molecule]],
+    symmetry: bool = True,
+    center: bool = False,
+    minimize: bool = False,
+    strip: bool = True,
+    cache: bool = True,
+    precision: str = "double",
+    validate: bool = True,
+    num_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    mp_context: Optional[BaseContext] = None,
+) -> List[float]:
+    """
+    Compute RMSD between a reference molecule and molecules, in parallel.
+
+    Parameters
+    ----------
+    molref: molecule.Molecule
+        Reference molecule
+    mols: Union[molecule.Molecule, List[molecule.Molecule]]
+        Molecules to compare to reference molecule
+    symmetry: bool, optional
+        Symmetry-corrected RMSD (using graph isomorphism)
+    center: bool, optional
+        Center molecules at origin
+    minimize: bool, optional
+        Minimised RMSD (using the quaternion polynomial method)
+    strip: bool, optional
+        Strip hydrogen atoms
+    cache: bool, optional
+        Cache graph isomorphisms (within each chunk of molecules)
+    precision: str, optional
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`), not used when :code:`minimize=True`
+    validate: bool, optional
+        Check that the inputs are consistent (once per chunk of molecules)
+    num_workers: int, optional
+        Number of worker processes (defaults to the number of CPUs)
+    chunksize: int, optional
+        Number of molecules sent to a worker process at once (defaults to an even
+        split of the molecules between worker processes)
+    mp_context: BaseContext, optional
+        Context used to start the worker processes (see :mod:`multiprocessing`)
+
+    Returns
+    -------
+    List[float]
+        RMSDs
+
+    Notes
+    -----
+    Worker processes are initialised once with the reference molecule, so that only
+    the molecules to compare are sent to each worker. Molecules are sent to workers
+    in chunks. Graph isomorphisms are computed once per chunk when :code:`cache=True`.
+
+    Unlike :func:`spyrmsd.rmsd.rmsdwrapper`, the molecules passed to this function
+    are not stripped in place.
+
+    If :code:`mp_context` is not given, the default start method is used, unless
+    multi-threaded Numba kernels have already been used in this process. In that case,
+    worker processes are started with the :code:`"forkserver"` method, since forking
+    the process is not safe with all Numba threading layers.
+
+    With the :code:`"spawn"` and :code:`"forkserver"` start methods, the main module
+    is imported by the worker processes. Scripts must therefore protect their entry
+    point with :code:`if __name__ == "__main__":`.
+    """
+
+    if not isinstance(mols, list):
+        mols = [mols]
+
+    if len(mols) == 0:
+        return []
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+
+    if chunksize is None:
+        chunksize = math.ceil(len(mols) / num_workers)
+
+    chunks = [mols[i : i + chunksize] for i in range(0, len(mols), chunksize)]
+
+    options = {
+        "symmetry": symmetry,
+        "center": center,
+        "minimize": minimize,
+        "strip": strip,
+        "cache": cache,
+        "precision": precision,
+        "validate": validate,
+    }
+
+    if mp_context is None:
+        mp_context = _default_context()
+
+    with ProcessPoolExecutor(
+        mp_context=mp_context,
+        max_workers=min(num_workers, len(chunks)),
+        initializer=_init_worker,
+        initargs=(molref, graph._get_backend(), options),
+    ) as executor:
+        RMSDlist = [
+            RMSD for RMSDs in executor.map(_rmsd_worker, chunks) for RMSD in RMSDs
+        ]
+
+    return RMSDlist
@@ -3,6 +3,7 @@ from typing import Tuple
 import numpy as np
 from scipy import optimize
 
+from . import kernels
 from .due import Doi, due
 
 due.cite(
@@ -222,7 +223,9 @@ def _lambda_max_eig(K: np.ndarray) -> float:
     return max(e)
 
 
-def qcp_rmsd(A: np.ndarray, B: np.ndarray, atol: float = 1e-9) -> float:
+def qcp_rmsd(
+    A: np.ndarray, B: np.ndarray, atol: float = 1e-9, center: bool = False
+) -> float:
     """
     Compute RMSD using the quaternion polynomial method.
 
@@ -234,6 +237,8 @@ def qcp_rmsd(A: np.ndarray, B: np.ndarray, atol: float = 1e-9) -> float:
         Coordinates of structure B
     atol: float
         Absolute tolerance parameter (see notes)
+    center: bool
+        Center structures `A` and `B` at the origin
 
     Returns
     -------
@@ -256,16 +261,18 @@ def qcp_rmsd(A: np.ndarray, B: np.ndarray, atol: float = 1e-9) -> float:
     negative because of numerical errors and therefore :math:`\\sqrt{s}` fails.
     In order to avoid this problem, the final RMSD is set to :math:`0`
     if :math:`|s| < atol`.
+
+    The inner products :math:`\\mathbf{M}`, :math:`G_a` and :math:`G_b` (and the
+    centering of `A` and `B`, if needed) are computed together by
+    :func:`spyrmsd.kernels.inner_products`.
     """
 
     assert A.shape == B.shape
 
     N = A.shape[0]
 
-    Ga = np.trace(A.T @ A)
-    Gb = np.trace(B.T @ B)
+    M, Ga, Gb = kernels.inner_products(A, B, center)
 
-    M = M_mtx(A, B)
     K = K_mtx(M)
 
     c2, c1, c0 = coefficients(M, K)
@@ -1,8 +1,32 @@
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
-from spyrmsd import graph, hungarian, molecule, qcp, utils
+from spyrmsd import graph, hungarian, kernels, molecule, qcp, utils
+
+
+def _centering_shift(coords1: np.ndarray, coords2: np.ndarray) -> np.ndarray:
+    """
+    Shift between the centers of geometry of two sets of coordinates.
+
+    Parameters
+    ----------
+    coords1: np.ndarray
+        Coordinate of molecule 1
+    coords2: np.ndarray
+        Coordinates of molecule 2
+
+    Returns
+    -------
+    np.ndarray
+        Difference between the centers of geometry of molecule 1 and molecule 2
+
+    Notes
+    -----
+    Subtracting the shift from the displacements between the coordinates is the same
+    as centering both molecules (see :func:`spyrmsd.kernels.sq_dev_mean`).
+    """
+    return utils.center_of_geometry(coords1) - utils.center_of_geometry(coords2)
 
 
 def rmsd(
@@ -13,6 +37,8 @@ def rmsd(
     center: bool = False,
     minimize: bool = False,
     atol: float = 1e-9,
+    precision: str = "double",
+    validate: bool = True,
 ) -> float:
     """
     Compute RMSD
@@ -33,6 +59,11 @@ def rmsd(
         Compute minimum RMSD (with QCP method)
     atol: float
         Absolute tolerance parameter for QCP method (see :func:`qcp_rmsd`)
+    precision: str
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`), not used by this function (see notes)
+    validate: bool
+        Check that the inputs are consistent (can be disabled for trusted inputs)
 
     Returns
     -------
@@ -47,23 +78,27 @@ def rmsd(
 
     .. [1] D. L. Theobald, *Rapid calculation of RMSDs using a quaternion-based
        characteristic polynomial*, Acta Crys. A **61**, 478-480 (2005).
-    """
 
-    assert np.all(atomicn1 == atomicn2)
-    assert coords1.shape == coords2.shape
+    The coordinates are reduced only once, therefore converting them to single
+    precision would cost more than it saves. The :code:`precision` argument is only
+    accepted for consistency with :func:`symmrmsd` and :func:`rmsdwrapper`, where the
+    conversion is done once for multiple reductions.
+    """
 
-    # Center coordinates if required
-    c1 = utils.center(coords1) if center or minimize else coords1
-    c2 = utils.center(coords2) if center or minimize else coords2
+    if validate:
+        assert np.array_equal(atomicn1, atomicn2)
+        assert coords1.shape == coords2.shape
 
     if minimize:
-        rmsd = qcp.qcp_rmsd(c1, c2, atol)
+        # Centering is fused with the computation of the QCP inner products
+        rmsd = qcp.qcp_rmsd(coords1, coords2, atol, center=True)
     else:
-        n = coords1.shape[0]
+        # Centering is folded into the reduction (no centred coordinates are built)
+        shift = _centering_shift(coords1, coords2) if center else None
 
-        rmsd = np.sqrt(np.sum((c1 - c2) ** 2) / n)
+        rmsd = np.sqrt(kernels.sq_dev_mean(coords1, coords2, shift))
 
-    return rmsd
+    return float(rmsd)
 
 
 def hrmsd(
@@ -72,6 +107,7 @@ def hrmsd(
     atomicn1: np.ndarray,
     atomicn2: np.ndarray,
     center=False,
+    validate: bool = True,
 ):
     """
     Compute minimum RMSD using the Hungarian method.
@@ -86,6 +122,10 @@ def hrmsd(
         Atomic numbers for molecule 1
     atomicn2: np.ndarray
         Atomic numbers for molecule 2
+    center: bool
+        Center molecules at origin
+    validate: bool
+        Check that the inputs are consistent (can be disabled for trusted inputs)
 
     Returns
     -------
@@ -104,8 +144,9 @@ def hrmsd(
         J. Chem. Inf. Model. **54**, 518-529 (2014)
     """
 
-    assert atomicn1.shape == atomicn2.shape
-    assert coords1.shape == coords2.shape
+    if validate:
+        assert atomicn1.shape == atomicn2.shape
+        assert coords1.shape == coords2.shape
 
     # Center coordinates if required
     c1 = utils.center(coords1) if center else coords1
@@ -114,6 +155,116 @@ def hrmsd(
     return hungarian.hungarian_rmsd(c1, c2, atomicn1, atomicn2)
 
 
+def _isomorphism_permutation(
+    idx1: Union[np.ndarray, List[int]],
+    idx2: Union[np.ndarray, List[int]],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Permutation of the nodes of graph 2 corresponding to a graph isomorphism.
+
+    Parameters
+    ----------
+    idx1: Union[np.ndarray, List[int]]
+        Nodes of graph 1
+    idx2: Union[np.ndarray, List[int]]
+        Corresponding nodes of graph 2
+    out: np.ndarray, optional
+        Buffer for the permutation (allocated if not given)
+
+    Returns
+    -------
+    np.ndarray
+        Nodes of graph 2 corresponding to the sorted nodes of graph 1
+        (:code:`0, ..., N-1`), as index array
+
+    Notes
+    -----
+    An isomorphism maps all the nodes of graph 1 to all the nodes of graph 2, therefore
+    the sorted nodes of graph 1 are the identity permutation. This means that the
+    coordinates of molecule 1 can be used as they are, and only the coordinates of
+    molecule 2 need to be permuted.
+
+    The nodes of graph 2 are scattered directly to the position of the corresponding
+    nodes of graph 1, which does not require sorting.
+    """
+    if out is None:
+        out = np.empty(len(idx1), dtype=np.intp)
+
+    out[idx1] = idx2
+
+    return out
+
+
+def _isomorphisms(
+    am1: np.ndarray,
+    am2: np.ndarray,
+    aprops1: np.ndarray,
+    aprops2: np.ndarray,
+    cache: bool = True,
+    G1: Optional[Any] = None,
+    G2: Optional[Any] = None,
+) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Compute graph isomorphisms between two molecules.
+
+    Parameters
+    ----------
+    am1: np.ndarray
+        Adjacency matrix for molecule 1
+    am2: np.ndarray
+        Adjacency matrix for molecule 2
+    aprops1: np.ndarray
+        Atomic properties for molecule 1
+    aprops2: np.ndarray
+        Atomic properties for molecule 2
+    cache: bool
+        Store computed graph isomorphisms, so that they can be re-used
+    G1: optional
+        Molecular graph of molecule 1 (built from :code:`am1` if not given)
+    G2: optional
+        Molecular graph of molecule 2 (built from :code:`am2` if not given)
+
+    Returns
+    -------
+    Iterable[Tuple[np.ndarray, np.ndarray]]
+        Graph isomorphisms, sorted according to molecule 1 (as index arrays)
+
+    Notes
+    -----
+    If :code:`cache=False`, graph isomorphisms are generated lazily and the same
+    buffer is re-used for all of them. Each isomorphism must therefore be consumed
+    before the next one is generated.
+    """
+
+    # Convert molecules to graphs (if not given)
+    if G1 is None:
+        G1 = graph.graph_from_adjacency_matrix(am1, aprops1)
+    if G2 is None:
+        G2 = graph.graph_from_adjacency_matrix(am2, aprops2)
+
+    # Isomorphisms are sorted according to molecule 1
+    # The nodes of molecule 1 are always the identity permutation
+    identity = np.arange(am1.shape[0], dtype=np.intp)
+
+    # Isomorphisms that are not cached are consumed one at a time
+    # The same buffer can therefore be re-used for all of them
+    buffer = None if cache else np.empty(am1.shape[0], dtype=np.intp)
+
+    # Get all the possible graph isomorphisms (lazily)
+    # Isomorphisms are converted to index arrays only once
+    isomorphisms: Iterable[Tuple[np.ndarray, np.ndarray]] = (
+        (identity, _isomorphism_permutation(idx1, idx2, out=buffer))
+        for idx1, idx2 in graph.match_graphs(G1, G2)
+    )
+
+    if cache:
+        # Store all graph isomorphisms, so that they can be re-used
+        isomorphisms = list(isomorphisms)
+
+    return isomorphisms
+
+
 def _rmsd_isomorphic_core(
     coords1: np.ndarray,
     coords2: np.ndarray,
@@ -123,9 +274,14 @@ def _rmsd_isomorphic_core(
     am2: np.ndarray,
     center: bool = False,
     minimize: bool = False,
-    isomorphisms: Optional[List[Tuple[List[int], List[int]]]] = None,
+    isomorphisms: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None,
     atol: float = 1e-9,
-) -> Tuple[float, List[Tuple[List[int], List[int]]]]:
+    cache: bool = True,
+    precision: str = "double",
+    validate: bool = True,
+    G1: Optional[Any] = None,
+    G2: Optional[Any] = None,
+) -> Tuple[float, Optional[List[Tuple[np.ndarray, np.ndarray]]]]:
     """
     Compute RMSD using graph isomorphism.
 
@@ -147,60 +303,173 @@ def _rmsd_isomorphic_core(
         Centering flag
     minimize: bool
         Compute minized RMSD
-    isomorphisms: Optional[List[Dict[int,int]]]
-        Previously computed graph isomorphism
+    isomorphisms: Optional[List[Tuple[np.ndarray, np.ndarray]]]
+        Previously computed graph isomorphisms (as returned by this function)
     atol: float
         Absolute tolerance parameter for QCP (see :func:`qcp_rmsd`)
+    cache: bool
+        Store computed graph isomorphisms, so that they can be re-used
+    precision: str
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`), not used when :code:`minimize=True`
+    validate: bool
+        Check that the inputs are consistent (can be disabled for trusted inputs)
+    G1: optional
+        Molecular graph of molecule 1 (built from :code:`am1` if not given)
+    G2: optional
+        Molecular graph of molecule 2 (built from :code:`am2` if not given)
 
     Returns
     -------
-    Tuple[float, List[Dict[int, int]]]
+    Tuple[float, Optional[List[Tuple[np.ndarray, np.ndarray]]]]
         RMSD (after graph matching) and graph isomorphisms
+
+    Notes
+    -----
+    If :code:`cache=False`, newly computed graph isomorphisms are consumed as they
+    are generated and are not stored in memory. In this case, :code:`None` is
+    returned instead of the graph isomorphisms.
     """
 
-    assert coords1.shape == coords2.shape
+    if validate:
+        assert coords1.shape == coords2.shape
 
-    n = coords1.shape[0]
+    if minimize:
+        # Center coordinates only once, for all graph isomorphisms
+        c1 = utils.center(coords1)
+        c2 = utils.center(coords2)
 
-    # Center coordinates if required
-    c1 = utils.center(coords1) if center or minimize else coords1
-    c2 = utils.center(coords2) if center or minimize else coords2
+        shift = None
+    else:
+        # Centering is folded into the reduction (no centred coordinates are built)
+        # Centers of geometry do not depend on the graph isomorphism
+        shift = _centering_shift(coords1, coords2) if center else None
+
+        # Convert coordinates only once, for all graph isomorphisms
+        c1 = kernels.as_precision(coords1, precision)
+        c2 = kernels.as_precision(coords2, precision)
 
     # No cached isomorphisms
     if isomorphisms is None:
-        # Convert molecules to graphs
-        G1 = graph.graph_from_adjacency_matrix(am1, aprops1)
-        G2 = graph.graph_from_adjacency_matrix(am2, aprops2)
-
-        # Get all the possible graph isomorphisms
-        isomorphisms = graph.match_graphs(G1, G2)
+        isomorphisms = _isomorphisms(
+            am1, am2, aprops1, aprops2, cache=cache, G1=G1, G2=G2
+        )
 
     # Minimum result
-    # Squared displacement (not minimize) or RMSD (minimize)
+    # Mean squared displacement (not minimize) or RMSD (minimize)
     min_result = np.inf
 
     # Loop over all graph isomorphisms to find the lowest RMSD
-    for idx1, idx2 in isomorphisms:
-        # Use the isomorphism to shuffle coordinates around (from original order)
-        c1i = c1[idx1, :]
-        c2i = c2[idx2, :]
-
+    # Isomorphisms are sorted according to molecule 1 (see _isomorphism_permutation)
+    # Only the coordinates of molecule 2 need to be shuffled around
+    for _, idx2 in isomorphisms:
         if not minimize:
-            # Compute square displacement
-            # Avoid dividing by n and an expensive sqrt() operation
-            result = np.sum((c1i - c2i) ** 2)
+            # Compute mean square displacement
+            # Avoid an expensive sqrt() operation
+            result = kernels.sq_dev_mean_permuted(c1, c2, idx2, shift)
         else:
             # Compute minimized RMSD using QCP
-            result = qcp.qcp_rmsd(c1i, c2i, atol)
+            result = qcp.qcp_rmsd(c1, c2[idx2, :], atol)
 
         min_result = result if result < min_result else min_result
 
+        # The RMSD can't be lower than zero
+        if min_result == 0.0:
+            break
+
     if not minimize:
-        # Compute actual RMSD from square displacement
-        min_result = np.sqrt(min_result / n)
+        # Compute actual RMSD from mean square displacement
+        min_result = np.sqrt(min_result)
 
     # Return the actual RMSD
-    return min_result, isomorphisms
+    return float(min_result), isomorphisms if cache else None
+
+
+def _rmsd_isomorphic_batch(
+    coords1: np.ndarray,
+    coords2: List[np.ndarray],
+    aprops1: np.ndarray,
+    aprops2: np.ndarray,
+    am1: np.ndarray,
+    am2: np.ndarray,
+    center: bool = False,
+    precision: str = "double",
+    validate: bool = True,
+    G1: Optional[Any] = None,
+    G2: Optional[Any] = None,
+) -> List[float]:
+    """
+    Compute RMSD using graph isomorphism for a batch of coordinates.
+
+    Parameters
+    ----------
+    coords1: np.ndarray
+        Coordinate of molecule 1
+    coords2: List[np.ndarray]
+        Coordinates of molecule 2
+    aprops1: np.ndarray
+        Atomic properties for molecule 1
+    aprops2: np.ndarray
+        Atomic properties for molecule 2
+    am1: np.ndarray
+        Adjacency matrix for molecule 1
+    am2: np.ndarray
+        Adjacency matrix for molecule 2
+    center: bool
+        Centering flag
+    precision: str
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`)
+    validate: bool
+        Check that the inputs are consistent (can be disabled for trusted inputs)
+    G1: optional
+        Molecular graph of molecule 1 (built from :code:`am1` if not given)
+    G2: optional
+        Molecular graph of molecule 2 (built from :code:`am2` if not given)
+
+    Returns
+    -------
+    List[float]
+        RMSDs (after graph matching)
+
+    Notes
+    -----
+    All the coordinates of molecule 2 share the same graph isomorphisms. Coordinates
+    are stacked into a single :code:`(M, N, 3)` array so that, for every graph
+    isomorphism, the RMSDs for all the coordinates are computed at once.
+    """
+
+    C1 = utils.center(coords1) if center else coords1
+
+    if validate:
+        for c in coords2:
+            assert c.shape == coords1.shape
+
+    C2 = np.stack(coords2)
+
+    if center:
+        C2 = C2 - np.mean(C2, axis=1, keepdims=True)
+
+    C1 = kernels.as_precision(C1, precision)
+    C2 = kernels.as_precision(C2, precision)
+
+    # Minimum mean square displacement for every coordinates of molecule 2
+    min_result = np.full(C2.shape[0], np.inf)
+
+    isomorphisms = _isomorphisms(am1, am2, aprops1, aprops2, cache=False, G1=G1, G2=G2)
+
+    for _, idx2 in isomorphisms:
+        np.minimum(
+            min_result,
+            kernels.sq_dev_mean_batch_permuted(C1, C2, idx2),
+            out=min_result,
+        )
+
+        # The RMSD can't be lower than zero
+        if not np.any(min_result):
+            break
+
+    return np.sqrt(min_result).tolist()
 
 
 def symmrmsd(
@@ -214,6 +483,10 @@ def symmrmsd(
     minimize: bool = False,
     cache: bool = True,
     atol: float = 1e-9,
+    precision: str = "double",
+    validate: bool = True,
+    Gref: Optional[Any] = None,
+    G: Optional[Any] = None,
 ) -> Any:
     """
     Compute RMSD using graph isomorphism for multiple coordinates.
@@ -240,6 +513,15 @@ def symmrmsd(
         Cache graph isomorphisms
     atol: float
         Absolute tolerance parameter for QCP (see :func:`qcp_rmsd`)
+    precision: str
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`), not used when :code:`minimize=True`
+    validate: bool
+        Check that the inputs are consistent (can be disabled for trusted inputs)
+    Gref: optional
+        Molecular graph of reference molecule (built from :code:`amref` if not given)
+    G: optional
+        Molecular graph of other molecule (built from :code:`am` if not given)
 
     Returns
     -------
@@ -254,9 +536,29 @@ def symmrmsd(
     matching according to atomic numbers and the molecular connectivity is
     performed. If atoms are in the same order and there is no symmetry, use the
     `rmsd` function.
+
+    Molecular graphs (see :func:`spyrmsd.molecule.Molecule.to_graph`) can be given
+    with :code:`Gref` and :code:`G`, so that they are not re-built from the adjacency
+    matrices for every call.
     """
 
-    if isinstance(coords, list):  # Multiple RMSD calculations
+    if isinstance(coords, list) and cache and not minimize and len(coords) > 0:
+        # Multiple RMSD calculations, for all coordinates at once
+        RMSD = _rmsd_isomorphic_batch(
+            coordsref,
+            coords,
+            apropsref,
+            aprops,
+            amref,
+            am,
+            center=center,
+            precision=precision,
+            validate=validate,
+            G1=Gref,
+            G2=G,
+        )
+
+    elif isinstance(coords, list):  # Multiple RMSD calculations
         RMSD: Any = []
         isomorphism = None
 
@@ -276,6 +578,11 @@ def symmrmsd(
                 minimize=minimize,
                 isomorphisms=isomorphism,
                 atol=atol,
+                cache=cache,
+                precision=precision,
+                validate=validate,
+                G1=Gref,
+                G2=G,
             )
 
             RMSD.append(srmsd)
@@ -292,6 +599,11 @@ def symmrmsd(
             minimize=minimize,
             isomorphisms=None,
             atol=atol,
+            cache=False,
+            precision=precision,
+            validate=validate,
+            G1=Gref,
+            G2=G,
         )
 
     return RMSD
@@ -305,6 +617,8 @@ def rmsdwrapper(
     minimize: bool = False,
     strip: bool = True,
     cache: bool = True,
+    precision: str = "double",
+    validate: bool = True,
 ) -> Any:
     """
     Compute RMSD between two molecule.
@@ -323,11 +637,31 @@ def rmsdwrapper(
         Minimised RMSD (using the quaternion polynomial method)
     strip: bool, optional
         Strip hydrogen atoms
+    cache: bool, optional
+        Cache graph isomorphisms
+    precision: str, optional
+        Floating point precision of the coordinates (:code:`"single"` or
+        :code:`"double"`), not used when :code:`minimize=True`
+    validate: bool, optional
+        Check that the inputs are consistent (can be disabled for trusted inputs)
 
     Returns
     -------
     List[float]
         RMSDs
+
+    Notes
+    -----
+    Inputs are validated only once, for all molecules. The underlying RMSD functions
+    are called with :code:`validate=False`.
+
+    Molecular graphs are cached on the molecules (see
+    :func:`spyrmsd.molecule.Molecule.to_graph`), therefore the graph of the reference
+    molecule is built only once when the same reference is used for multiple calls.
+
+    If :code:`minimize=False`, the coordinates of all the molecules are stacked
+    together and the RMSDs are computed at once (for every graph isomorphism, if
+    :code:`symmetry=True` and :code:`cache=True`).
     """
 
     if not isinstance(mols, list):
@@ -345,6 +679,14 @@ def rmsdwrapper(
     cref = molecule.coords_from_molecule(molref, center)
     cmols = [molecule.coords_from_molecule(mol, center) for mol in mols]
 
+    if validate:
+        for c in cmols:
+            assert c.shape == cref.shape
+
+        if not symmetry:
+            # Atoms are assumed to be in the same order
+            assert np.array_equal(molref.atomicnums, mols[0].atomicnums)
+
     RMSDlist = []
 
     if symmetry:
@@ -358,7 +700,18 @@ def rmsdwrapper(
             center=center,
             minimize=minimize,
             cache=cache,
+            precision=precision,
+            validate=False,
+            Gref=molref.to_graph(),
+            G=mols[0].to_graph(),
         )
+    elif not minimize:  # No symmetry, all RMSDs at once
+        # Coordinates are already centred (if required)
+        C = kernels.as_precision(np.stack(cmols), precision)
+
+        RMSDlist = np.sqrt(
+            kernels.sq_dev_mean_batch(kernels.as_precision(cref, precision), C)
+        ).tolist()
     else:  # No symmetry
         for c in cmols:
             RMSDlist.append(
@@ -369,6 +722,8 @@ def rmsdwrapper(
                     mols[0].atomicnums,
                     center=center,
                     minimize=minimize,
+                    precision=precision,
+                    validate=False,
                 )
             )
 
@@ -102,7 +102,7 @@ def test_match_graphs_isomorphic_lattice(n) -> None:
     G2 = graph.lattice(n, n)
 
     with pytest.warns(UserWarning, match=gc.warn_no_atomic_properties):
-        isomorphisms = graph.match_graphs(G1, G2)
+        isomorphisms = list(graph.match_graphs(G1, G2))
 
     assert len(isomorphisms) != 0
 
@@ -113,7 +113,7 @@ def test_match_graphs_isomorphic_cycle(n) -> None:
     G2 = graph.cycle(n)
 
     with pytest.warns(UserWarning, match=gc.warn_no_atomic_properties):
-        isomorphisms = graph.match_graphs(G1, G2)
+        isomorphisms = list(graph.match_graphs(G1, G2))
 
     assert len(isomorphisms) != 0
 
@@ -140,6 +140,59 @@ def test_match_graphs_not_isomorphic_cycle(n) -> None:
         graph.match_graphs(G1, G2)
 
 
+@pytest.mark.parametrize(
+    "aprops1, aprops2",
+    [([6, 6, 6, 6], [6, 6, 6, 7]), ([6, 7, 6, 7], [6, 6, 7, 7])],
+    ids=["invariants", "vf2"],
+)
+def test_match_graphs_not_isomorphic_aprops(aprops1, aprops2) -> None:
+    # Chain of four atoms
+    A = np.array([[0, 1, 0, 0], [1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0]])
+
+    G1 = graph.graph_from_adjacency_matrix(A, aprops1)
+    G2 = graph.graph_from_adjacency_matrix(A, aprops2)
+
+    with pytest.raises(NonIsomorphicGraphs, match=gc.error_non_isomorphic_graphs):
+        graph.match_graphs(G1, G2)
+
+
+@pytest.mark.parametrize(
+    "degrees1, degrees2, aprops1, aprops2, match",
+    [
+        ([1, 2, 1], [2, 1, 1], None, None, True),
+        ([1, 2, 1], [1, 2, 2], None, None, False),
+        ([1, 2, 1], [1, 1, 2], [6, 7, 6], [6, 6, 7], True),
+        ([1, 2, 1], [1, 1, 2], [6, 7, 6], [7, 6, 6], False),
+        ([1, 1], [1, 1, 1], None, None, False),
+    ],
+)
+def test_invariants_match(degrees1, degrees2, aprops1, aprops2, match) -> None:
+    assert gc.invariants_match(degrees1, degrees2, aprops1, aprops2) == match
+
+
+def test_match_graphs_unhashable_aprops() -> None:
+    if spyrmsd.get_backend() == "graph-tool":
+        pytest.skip("graph-tool does not support Python objects as node properties.")
+
+    # Chain of three atoms
+    A = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]])
+
+    aprops = [[6, 0], [6, 1], [6, 0]]
+
+    G1 = graph.graph_from_adjacency_matrix(A, aprops)
+    G2 = graph.graph_from_adjacency_matrix(A, aprops)
+
+    assert len(list(graph.match_graphs(G1, G2))) == 2
+
+
+def test_invariants_match_unhashable_aprops() -> None:
+    # Unhashable atomic properties fall back to node degrees only
+    assert gc.invariants_match([1, 2, 1], [2, 1, 1], [[6], [7], [6]], [[7], [6], [6]])
+    assert not gc.invariants_match(
+        [1, 2, 1], [1, 2, 2], [[6], [7], [6]], [[6], [7], [6]]
+    )
+
+
 @pytest.mark.parametrize(
     "property",
     [
@@ -0,0 +1,234 @@
+import numpy as np
+import pytest
+
+from spyrmsd import kernels, qcp, utils
+
+
+@pytest.fixture(autouse=True, params=[True, False], ids=["numba", "numpy"])
+def kernels_impl(monkeypatch, request):
+    """
+    Run kernel tests with both the Numba and the NumPy implementations.
+    """
+    if request.param:
+        if not kernels._numba_available:
+            pytest.skip("Numba is not installed.")
+    else:
+        monkeypatch.setattr(kernels, "_sq_dev_mean", kernels._sq_dev_mean_numpy)
+        monkeypatch.setattr(
+            kernels, "_sq_dev_mean_shifted", kernels._sq_dev_mean_shifted_numpy
+        )
+        monkeypatch.setattr(
+            kernels, "_sq_dev_mean_permuted", kernels._sq_dev_mean_permuted_numpy
+        )
+        monkeypatch.setattr(
+            kernels, "_sq_dev_mean_batch", kernels._sq_dev_mean_batch_numpy
+        )
+        monkeypatch.setattr(
+            kernels,
+            "_sq_dev_mean_batch_permuted",
+            kernels._sq_dev_mean_batch_permuted_numpy,
+        )
+        monkeypatch.setattr(kernels, "_inner_products", kernels._inner_products_numpy)
+
+
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_sq_dev_mean(n: int) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3))
+    B = rng.random((n, 3))
+
+    assert kernels.sq_dev_mean(A, B) == pytest.approx(
+        np.mean(np.sum((A - B) ** 2, axis=1))
+    )
+
+
+def test_sq_dev_mean_translation(mol) -> None:
+    A = mol.mol.coordinates
+    B = A + np.array([0.0, 0.0, 2.0])
+
+    assert kernels.sq_dev_mean(A, A) == pytest.approx(0.0)
+    assert kernels.sq_dev_mean(A, B) == pytest.approx(4.0)
+
+
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_sq_dev_mean_permuted(n: int) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3))
+    B = rng.random((n, 3))
+
+    idx = rng.permutation(n)
+
+    assert kernels.sq_dev_mean_permuted(A, B, idx) == pytest.approx(
+        np.mean(np.sum((A - B[idx]) ** 2, axis=1))
+    )
+
+
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_sq_dev_mean_shift(n: int) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3)) + 1.0
+    B = rng.random((n, 3)) - 1.0
+
+    idx = rng.permutation(n)
+
+    shift = utils.center_of_geometry(A) - utils.center_of_geometry(B)
+
+    # Shift between centers of geometry is equivalent to centering
+    assert kernels.sq_dev_mean(A, B, shift) == pytest.approx(
+        kernels.sq_dev_mean(utils.center(A), utils.center(B))
+    )
+    assert kernels.sq_dev_mean_permuted(A, B, idx, shift) == pytest.approx(
+        kernels.sq_dev_mean_permuted(utils.center(A), utils.center(B), idx)
+    )
+
+
+def test_sq_dev_mean_non_contiguous() -> None:
+    rng = np.random.default_rng(42)
+
+    AB = rng.random((10, 6))
+
+    A = AB[:, :3]
+    B = AB[:, 3:]
+
+    assert not A.flags.c_contiguous
+
+    assert kernels.sq_dev_mean(A, B) == pytest.approx(
+        np.mean(np.sum((A - B) ** 2, axis=1))
+    )
+
+
+@pytest.mark.parametrize("center", [True, False])
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_inner_products(n: int, center: bool) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3)) + 1.0
+    B = rng.random((n, 3)) - 1.0
+
+    M, Ga, Gb = kernels.inner_products(A, B, center)
+
+    if center:
+        A = utils.center(A)
+        B = utils.center(B)
+
+    assert M == pytest.approx(qcp.M_mtx(A, B))
+    assert Ga == pytest.approx(np.trace(A.T @ A))
+    assert Gb == pytest.approx(np.trace(B.T @ B))
+
+
+@pytest.mark.parametrize(
+    "precision, dtype", [("single", np.float32), ("double", np.float64)]
+)
+def test_as_precision(precision: str, dtype) -> None:
+    A = np.zeros((10, 3), dtype=dtype)
+
+    # No copy if the precision is already correct
+    assert kernels.as_precision(A, precision) is A
+    assert kernels.as_precision(A.astype(int), precision).dtype == dtype
+
+
+def test_as_precision_unsupported() -> None:
+    A = np.zeros((10, 3))
+
+    with pytest.raises(ValueError, match="Unsupported precision 'half'"):
+        kernels.as_precision(A, "half")
+
+
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_sq_dev_mean_single_precision(n: int) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3)) * 10
+    B = rng.random((n, 3)) * 10
+
+    idx = rng.permutation(n)
+
+    A32 = kernels.as_precision(A, "single")
+    B32 = kernels.as_precision(B, "single")
+
+    assert kernels.sq_dev_mean(A32, B32) == pytest.approx(
+        kernels.sq_dev_mean(A, B), rel=1e-5
+    )
+    assert kernels.sq_dev_mean_permuted(A32, B32, idx) == pytest.approx(
+        kernels.sq_dev_mean_permuted(A, B, idx), rel=1e-5
+    )
+
+
+@pytest.mark.parametrize("m", [1, 5])
+@pytest.mark.parametrize("n", [1, 10, 100])
+def test_sq_dev_mean_batch(n: int, m: int) -> None:
+    rng = np.random.default_rng(42)
+
+    A = rng.random((n, 3))
+    B = rng.random((m, n, 3))
+
+    idx = rng.permutation(n)
+
+    assert kernels.sq_dev_mean_batch(A, B) == pytest.approx(
+        [kernels.sq_dev_mean(A, b) for b in B]
+    )
+    assert kernels.sq_dev_mean_batch_permuted(A, B, idx) == pytest.approx(
+        [kernels.sq_dev_mean_permuted(A, b, idx) for b in B]
+    )
+
+
+@pytest.mark.parametrize("threshold", [0, 10**9], ids=["parallel", "serial"])
+def test_sq_dev_mean_batch_numba_parallel(monkeypatch, threshold: int) -> None:
+    if not kernels._numba_available:
+        pytest.skip("Numba is not installed.")
+
+    from spyrmsd import _kernels_numba
+
+    monkeypatch.setattr(_kernels_numba, "parallel_threshold", threshold)
+
+    rng = np.random.default_rng(42)
+
+    A = rng.random((10, 3))
+    B = rng.random((20, 10, 3))
+
+    idx = rng.permutation(10)
+
+    assert _kernels_numba.sq_dev_mean_batch(A, B) == pytest.approx(
+        kernels._sq_dev_mean_batch_numpy(A, B)
+    )
+    assert _kernels_numba.sq_dev_mean_batch_permuted(A, B, idx) == pytest.approx(
+        kernels._sq_dev_mean_batch_permuted_numpy(A, B, idx)
+    )
+
+
+def test_sq_dev_mean_batch_numba_parallel_compilation() -> None:
+    if not kernels._numba_available:
+        pytest.skip("Numba is not installed.")
+
+    import numba
+
+    from spyrmsd import _kernels_numba
+
+    rng = np.random.default_rng(42)
+
+    A = rng.random((10, 3))
+    B = rng.random((20, 10, 3))
+
+    idx = rng.permutation(10)
+
+    for kernel, args, parallel in [
+        (_kernels_numba._sq_dev_mean_batch_serial, (A, B), False),
+        (_kernels_numba._sq_dev_mean_batch_permuted_serial, (A, B, idx), False),
+        (_kernels_numba._sq_dev_mean_batch_parallel, (A, B), True),
+        (_kernels_numba._sq_dev_mean_batch_permuted_parallel, (A, B, idx), True),
+    ]:
+        # Kernels loaded from the on-disk cache have no metadata
+        # Compile the kernel again (without cache) with the same options
+        compiled = numba.jit(**kernel.targetoptions)(kernel.py_func)
+        compiled(*args)
+
+        metadata = compiled.get_metadata(compiled.signatures[0])
+        diagnostics = metadata.get("parfor_diagnostics")
+
+        # Parallel kernels contain parallel loops, serial kernels do not
+        has_parfors = diagnostics is not None and diagnostics.has_setup
+
+        assert has_parfors == parallel
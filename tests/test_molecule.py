@@ -83,6 +83,24 @@ def test_molecule_center_of_geometry_benzene(benzene) -> None:
     assert np.allclose(benzene.mol.center_of_geometry(), np.zeros(3))
 
 
+def test_molecule_center_of_geometry_inplace(benzene) -> None:
+    m = copy.deepcopy(benzene.mol)
+
+    assert np.allclose(m.center_of_geometry(), np.zeros(3))
+
+    # Coordinates modified in place (e.g. trajectory frames)
+    m.coordinates[:] += 5.0
+
+    cog = m.center_of_geometry()
+
+    assert np.allclose(cog, np.full(3, 5.0))
+
+    # Center of geometry is a new array
+    cog += 1.0
+
+    assert np.allclose(m.center_of_geometry(), np.full(3, 5.0))
+
+
 def test_molecule_center_of_mass_benzene(benzene) -> None:
     assert np.allclose(benzene.mol.center_of_mass(), np.zeros(3))
 
@@ -0,0 +1,133 @@
+import math
+import multiprocessing
+from typing import List
+
+import pytest
+
+from spyrmsd import kernels, parallel, rmsd
+from spyrmsd.parallel import prmsdwrapper
+
+
+@pytest.mark.parametrize(
+    # Reference results obtained with OpenBabel
+    "minimize, referenceRMSDs",
+    [
+        (
+            True,  # Minimize: QCP + Isomorphism
+            [
+                0.476858,
+                1.68089,
+                1.50267,
+                1.90623,
+                1.01324,
+                1.31716,
+                1.11312,
+                1.06044,
+                0.965387,
+                1.37842,
+            ],
+        ),
+        (
+            False,  # No minimize: Isomorphism only
+            [
+                0.592256,
+                2.11545,
+                2.29824,
+                9.45773,
+                1.35005,
+                9.44356,
+                9.59758,
+                9.55076,
+                2.44067,
+                9.6171,
+            ],
+        ),
+    ],
+    ids=["minimize", "no_minimize"],
+)
+@pytest.mark.parametrize(
+    "num_workers, chunksize", [(1, None), (2, None), (2, 3)], ids=str
+)
+def test_prmsdwrapper_isomorphic(
+    docking_1cbr,
+    minimize: bool,
+    referenceRMSDs: List[float],
+    num_workers: int,
+    chunksize: int,
+) -> None:
+    molref = docking_1cbr[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in docking_1cbr[1:]]
+
+    RMSDs = prmsdwrapper(
+        molref,
+        mols,
+        minimize=minimize,
+        strip=True,
+        num_workers=num_workers,
+        chunksize=chunksize,
+    )
+
+    assert len(RMSDs) == len(referenceRMSDs)
+
+    for RMSD, referenceRMSD in zip(RMSDs, referenceRMSDs):
+        assert RMSD == pytest.approx(referenceRMSD, abs=1e-5)
+
+
+@pytest.mark.parametrize("minimize", [True, False], ids=["minimize", "no_minimize"])
+def test_prmsdwrapper_nosymm_protein(trps, minimize: bool) -> None:
+    mol0 = trps[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in trps[1:]]
+
+    RMSDs = prmsdwrapper(
+        mol0, mols, symmetry=False, minimize=minimize, strip=False, num_workers=2
+    )
+
+    referenceRMSDs = rmsd.rmsdwrapper(
+        mol0, mols, symmetry=False, minimize=minimize, strip=False
+    )
+
+    assert RMSDs == pytest.approx(referenceRMSDs)
+
+
+def test_prmsdwrapper_single_molecule(docking_1cbr) -> None:
+    molref = docking_1cbr[0].copy_coords_only()
+    mol = docking_1cbr[1].copy_coords_only()
+
+    RMSD = prmsdwrapper(molref, mol, minimize=True, strip=True, num_workers=2)
+
+    assert len(RMSD) == 1
+    assert RMSD[0] == pytest.approx(0.476858, abs=1e-5)
+
+
+def test_prmsdwrapper_no_molecules(benzene) -> None:
+    assert prmsdwrapper(benzene.mol, []) == []
+
+
+def test_prmsdwrapper_mp_context(docking_1cbr) -> None:
+    molref = docking_1cbr[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in docking_1cbr[1:4]]
+
+    RMSDs = prmsdwrapper(
+        molref, mols, num_workers=2, mp_context=multiprocessing.get_context("spawn")
+    )
+
+    assert RMSDs == pytest.approx(rmsd.rmsdwrapper(molref, mols))
+
+
+def test_init_worker_serial_kernels(benzene, monkeypatch) -> None:
+    if not kernels._numba_available:
+        pytest.skip("Numba is not installed.")
+
+    from spyrmsd import _kernels_numba
+
+    # Restore global variables modified by the worker initialisation
+    monkeypatch.setattr(_kernels_numba, "parallel_threshold", 10_000)
+    monkeypatch.setattr(parallel, "_molref", None)
+    monkeypatch.setattr(parallel, "_options", {})
+
+    parallel._init_worker(
+        benzene.mol.copy_coords_only(), None, {"strip": False, "symmetry": False}
+    )
+
+    # Parallel kernels are never used (nor compiled) in worker processes
+    assert _kernels_numba.parallel_threshold == math.inf
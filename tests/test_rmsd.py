@@ -106,6 +106,27 @@ def test_rmsd_centred_benzene(benzene) -> None:
     ) == pytest.approx(0)
 
 
+@pytest.mark.parametrize("precision", ["single", "double"])
+@pytest.mark.parametrize("minimize", [True, False], ids=["minimize", "no_minimize"])
+def test_rmsd_return_type(benzene, precision: str, minimize: bool) -> None:
+    mol1 = copy.deepcopy(benzene.mol)
+    mol2 = copy.deepcopy(benzene.mol)
+
+    mol2.translate(np.array([0, 0, 1]))
+
+    RMSD = rmsd.rmsd(
+        mol1.coordinates,
+        mol2.coordinates,
+        mol1.atomicnums,
+        mol2.atomicnums,
+        minimize=minimize,
+        precision=precision,
+    )
+
+    assert type(RMSD) is float
+    assert RMSD == pytest.approx(0.0 if minimize else 1.0)
+
+
 def test_rmsd_minimize(mol) -> None:
     mol1 = copy.deepcopy(mol.mol)
     mol2 = copy.deepcopy(mol.mol)
@@ -635,6 +656,88 @@ def test_symmrmsd_cache(
         assert RMSD == pytest.approx(referenceRMSD, abs=1e-5)
 
 
+def test_symmrmsd_batch_validate(benzene) -> None:
+    mol = benzene.mol
+
+    with pytest.raises(AssertionError):
+        rmsd.symmrmsd(
+            mol.coordinates,
+            [mol.coordinates, mol.coordinates[:-1]],
+            mol.atomicnums,
+            mol.atomicnums,
+            mol.adjacency_matrix,
+            mol.adjacency_matrix,
+            cache=True,
+        )
+
+
+@pytest.mark.parametrize("center", [True, False], ids=["center", "no_center"])
+def test_symmrmsd_batch(docking_1cbr, center: bool) -> None:
+    molc = copy.deepcopy(docking_1cbr[0])
+    mols = [copy.deepcopy(mol) for mol in docking_1cbr[1:]]
+
+    molc.strip()
+
+    for mol in mols:
+        mol.strip()
+
+    args = (
+        molc.coordinates,
+        [mol.coordinates for mol in mols],
+        molc.atomicnums,
+        mols[0].atomicnums,
+        molc.adjacency_matrix,
+        mols[0].adjacency_matrix,
+    )
+
+    # All coordinates at once (cache=True) or one at a time (cache=False)
+    RMSDs_batch = rmsd.symmrmsd(*args, center=center, cache=True)
+    RMSDs = rmsd.symmrmsd(*args, center=center, cache=False)
+
+    assert RMSDs_batch == pytest.approx(RMSDs)
+
+
+@pytest.mark.parametrize("cache", [True, False], ids=["cache", "nocache"])
+def test_rmsd_isomorphic_core_cache(benzene, cache: bool) -> None:
+    mol1 = copy.deepcopy(benzene.mol)
+    mol2 = copy.deepcopy(benzene.mol)
+
+    RMSD, isomorphisms = rmsd._rmsd_isomorphic_core(
+        mol1.coordinates,
+        mol2.coordinates,
+        mol1.atomicnums,
+        mol2.atomicnums,
+        mol1.adjacency_matrix,
+        mol2.adjacency_matrix,
+        cache=cache,
+    )
+
+    assert RMSD == pytest.approx(0.0)
+
+    if cache:
+        # All the symmetries of benzene with hydrogen atoms
+        assert len(isomorphisms) == 12
+    else:
+        assert isomorphisms is None
+
+
+def test_isomorphism_permutation() -> None:
+    idx2 = rmsd._isomorphism_permutation([2, 0, 3, 1], [1, 3, 0, 2])
+
+    assert np.array_equal(idx2, [3, 2, 1, 0])
+
+
+def test_isomorphism_permutation_buffer() -> None:
+    buffer = np.empty(4, dtype=np.intp)
+
+    idx2 = rmsd._isomorphism_permutation(
+        np.array([2, 0, 3, 1]), np.array([1, 3, 0, 2]), out=buffer
+    )
+
+    assert idx2 is buffer
+    assert np.array_equal(idx2, [3, 2, 1, 0])
+
+
 def test_issue_35_1():
     """
     GitHub Issue #35 from @kjelljorner
@@ -902,8 +1005,8 @@ def test_symmrmsd_atol_multi(docking_1cbr) -> None:
     ids=["no_minimize", "minimize"],
 )
 def test_rmsdwrapper_nosymm_protein(trps, minimize: bool, referenceRMSDs: List[float]):
-    mol0 = copy.deepcopy(trps[0])
-    mols = [copy.deepcopy(mol) for mol in trps[1:]]
+    mol0 = trps[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in trps[1:]]
 
     RMSDs = rmsd.rmsdwrapper(mol0, mols, symmetry=False, minimize=minimize, strip=False)
 
@@ -951,8 +1054,8 @@ def test_rmsdwrapper_nosymm_protein(trps, minimize: bool, referenceRMSDs: List[f
 def test_rmsdwrapper_isomorphic(
     docking_1cbr, minimize: bool, referenceRMSDs: List[float]
 ) -> None:
-    molref = copy.deepcopy(docking_1cbr[0])
-    mols = [copy.deepcopy(mol) for mol in docking_1cbr[1:]]
+    molref = docking_1cbr[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in docking_1cbr[1:]]
 
     RMSDs = rmsd.rmsdwrapper(molref, mols, minimize=minimize, strip=True)
 
@@ -969,9 +1072,100 @@ def test_rmsdwrapper_isomorphic(
 def test_rmsdwrapper_single_molecule(
     docking_1cbr, minimize: bool, referenceRMSD: float
 ) -> None:
-    molref = copy.deepcopy(docking_1cbr[0])
-    mols = copy.deepcopy(docking_1cbr[1])
+    molref = docking_1cbr[0].copy_coords_only()
+    mols = docking_1cbr[1].copy_coords_only()
 
     RMSD = rmsd.rmsdwrapper(molref, mols, minimize=minimize, strip=True)
 
     assert RMSD[0] == pytest.approx(referenceRMSD, abs=1e-5)
+
+
+def test_rmsdwrapper_isomorphic_single_precision(docking_1cbr) -> None:
+    molref = docking_1cbr[0].copy_coords_only()
+    mols = [mol.copy_coords_only() for mol in docking_1cbr[1:]]
+
+    # Reference results obtained with OpenBabel
+    referenceRMSDs = [
+        0.592256,
+        2.11545,
+        2.29824,
+        9.45773,
+        1.35005,
+        9.44356,
+        9.59758,
+        9.55076,
+        2.44067,
+        9.6171,
+    ]
+
+    RMSDs = rmsd.rmsdwrapper(molref, mols, strip=True, precision="single")
+
+    for RMSD, referenceRMSD in zip(RMSDs, referenceRMSDs):
+        assert RMSD == pytest.approx(referenceRMSD, abs=1e-5)
+
+
+def test_rmsd_validate(benzene) -> None:
+    atomicnums = benzene.mol.atomicnums.copy()
+    atomicnums[0] = 7
+
+    with pytest.raises(AssertionError):
+        rmsd.rmsd(
+            benzene.mol.coordinates,
+            benzene.mol.coordinates,
+            benzene.mol.atomicnums,
+            atomicnums,
+        )
+
+    # Validation disabled for trusted inputs
+    RMSD = rmsd.rmsd(
+        benzene.mol.coordinates,
+        benzene.mol.coordinates,
+        benzene.mol.atomicnums,
+        atomicnums,
+        validate=False,
+    )
+
+    assert RMSD == pytest.approx(0.0)
+
+
+def test_rmsdwrapper_validate(benzene) -> None:
+    molref = benzene.mol.copy_coords_only()
+    mol = benzene.mol.copy_coords_only()
+
+    mol.strip()
+
+    with pytest.raises(AssertionError):
+        rmsd.rmsdwrapper(molref, mol, symmetry=False, strip=False)
+
+
+def test_rmsdwrapper_coordinates_inplace(benzene) -> None:
+    molref = benzene.mol.copy_coords_only()
+    mol = benzene.mol.copy_coords_only()
+
+    # Coordinates modified in place (e.g. trajectory frames)
+    mol.coordinates[:] += 5.0
+
+    RMSDs = rmsd.rmsdwrapper(molref, mol, symmetry=False, center=True, strip=False)
+
+    assert RMSDs[0] == pytest.approx(0.0)
+
+
+def test_rmsdwrapper_cached_graph(benzene, monkeypatch) -> None:
+    molref = benzene.mol.copy_coords_only()
+    mols = [benzene.mol.copy_coords_only() for _ in range(2)]
+
+    molref.to_graph()
+    for mol in mols:
+        mol.to_graph()
+
+    # Cached molecular graphs are used, instead of building new graphs
+    monkeypatch.setattr(
+        rmsd.graph,
+        "graph_from_adjacency_matrix",
+        lambda *args: pytest.fail("Molecular graph was not cached"),
+    )
+
+    for mol in mols:
+        RMSDs = rmsd.rmsdwrapper(molref, mol, strip=False)
+
+        assert RMSDs[0] == pytest.approx(0.0)